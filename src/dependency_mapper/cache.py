@@ -0,0 +1,112 @@
+import hashlib
+import logging
+import os
+import pickle
+import re
+import shutil
+import tempfile
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import astroid
+
+from .models import Edge, Node
+
+
+_PACKAGE_DIR = Path(__file__).parent
+
+# Namespaces are 16-byte blake2b digests; only directories named like one are
+# ever deleted from the cache directory.
+_NAMESPACE_RE = re.compile(r"[0-9a-f]{32}")
+
+
+def _parser_sources() -> List[Path]:
+    """Files whose contents determine the parsers' output."""
+    return [
+        *sorted((_PACKAGE_DIR / "parsers").glob("*.py")),
+        _PACKAGE_DIR / "models.py",
+        _PACKAGE_DIR.parent / "ts_parser" / "index.js",
+    ]
+
+
+class CacheStore:
+    """
+    An on-disk cache of per-file parse results, keyed by each file's path and
+    content.
+
+    Entries are only reused within the same namespace, which covers the parser
+    sources, the astroid version and the project root. Editing or upgrading the
+    parsers therefore starts a fresh cache, and only the current namespace is
+    kept on disk. TS entries are also keyed by their tsconfig. Cached results
+    are not invalidated by changes to other files: edges pointing into a file
+    that changed, was added or was removed may be stale until the dependent
+    file changes.
+
+    Entries are pickles, so the cache directory must be trusted.
+    """
+
+    def __init__(self, cache_dir: Path, namespace: str):
+        self.cache_dir = cache_dir
+        self.namespace = namespace
+
+    @staticmethod
+    def make_namespace(root_path: Path) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        for source in _parser_sources():
+            try:
+                digest.update(source.read_bytes())
+            except OSError:
+                digest.update(str(source).encode("utf-8"))
+        digest.update(astroid.__version__.encode("utf-8"))
+        digest.update(str(root_path).encode("utf-8"))
+        return digest.hexdigest()
+
+    def key(self, file_path: Path, content: bytes, *extra: bytes) -> str:
+        """Keys a file's result by its path, content and any `extra` inputs it depends on."""
+        digest = hashlib.blake2b(self.namespace.encode("utf-8"), digest_size=20)
+        digest.update(str(file_path).encode("utf-8"))
+        for part in (content, *extra):
+            # Length-prefixed, so different splits of the same bytes never collide.
+            digest.update(len(part).to_bytes(8, "little"))
+            digest.update(part)
+        return digest.hexdigest()
+
+    def remove_other_namespaces(self) -> None:
+        """Deletes the entries of every other namespace, which can never be hit again."""
+        try:
+            entries = list(os.scandir(self.cache_dir))
+        except OSError:
+            return
+        for entry in entries:
+            if entry.name != self.namespace and _NAMESPACE_RE.fullmatch(entry.name) and entry.is_dir():
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+    def get(self, key: str) -> Optional[Tuple[List[Node], List[Edge]]]:
+        try:
+            with open(self._entry_path(key), "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable cache entry {key}: {e}")
+            return None
+
+    def put(self, key: str, result: Tuple[List[Node], List[Edge]]) -> None:
+        entry_path = self._entry_path(key)
+        try:
+            entry_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file and rename it into place, so concurrent
+            # workers never observe a partially written entry.
+            fd, tmp_path = tempfile.mkstemp(dir=entry_path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, entry_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            logging.warning(f"Could not write cache entry {key}: {e}")
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / self.namespace / key[:2] / f"{key}.pickle"
@@ -35,6 +35,12 @@ def main():
         default=None,
         help="Number of parallel worker processes to use. Defaults to the number of CPU cores.",
     )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        help="Directory in which to cache per-file parse results between runs. Entries are pickles, so the directory must be trusted. Disabled by default.",
+    )
     parser.add_argument(
         "--format",
         "-f",
@@ -66,7 +72,7 @@ def main():
     start_time = time.perf_counter()
     try:
         # Pass the number of workers from the CLI to the API.
-        graph = generate_graph(root_path, num_workers=args.workers)
+        graph = generate_graph(root_path, num_workers=args.workers, cache_dir=args.cache_dir)
     except KeyboardInterrupt:
         print("\nInterrupted by user. Terminating...")
         sys.exit(1)
@@ -84,19 +90,16 @@ def main():
         return # Skip normal output
 
     if args.output_file:
-        output_str = ""
+        output_bytes = b""
         if args.format == "json":
             serializer = JsonSerializer()
-            output_str = serializer.serialize(graph)
+            output_bytes = serializer.serialize_bytes(graph)
         elif args.format == "dot":
             serializer = DotSerializer()
-            try:
-                output_str = serializer.serialize(graph)
-            except ImportError as e:
-                parser.error(f"Error: {e}")
+            output_bytes = serializer.serialize(graph).encode("utf-8")
 
         try:
-            args.output_file.write_text(output_str, encoding="utf-8")
+            args.output_file.write_bytes(output_bytes)
             print(f"Successfully saved graph to {args.output_file}")
         except IOError as e:
             parser.error(f"Error writing to output file '{args.output_file}': {e}")
@@ -106,23 +109,21 @@ def main():
 
         # Save JSON format
         serializer = JsonSerializer()
-        output_str = serializer.serialize(graph)
+        output_bytes = serializer.serialize_bytes(graph)
         json_path = Path("output/dependency_graph.json")
         try:
-            json_path.write_text(output_str, encoding="utf-8")
+            json_path.write_bytes(output_bytes)
             print(f"Successfully saved JSON graph to {json_path}")
         except IOError as e:
             parser.error(f"Error writing JSON to output file '{json_path}': {e}")
 
         # Save DOT format
+        serializer = DotSerializer()
+        output_str = serializer.serialize(graph)
+        dot_path = Path("output/dependency_graph.dot")
         try:
-            serializer = DotSerializer()
-            output_str = serializer.serialize(graph)
-            dot_path = Path("output/dependency_graph.dot")
             dot_path.write_text(output_str, encoding="utf-8")
             print(f"Successfully saved DOT graph to {dot_path}")
-        except ImportError as e:
-            print(f"Warning: Could not generate DOT format: {e}")
         except IOError as e:
             parser.error(f"Error writing DOT to output file '{dot_path}': {e}")
 
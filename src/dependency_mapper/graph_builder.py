@@ -1,17 +1,43 @@
-from typing import List
+from typing import Any, Dict, Iterable, List, Tuple
 
 import networkx as nx
 
 from .models import Edge, Node
 
 
+def _node_attrs(node: Node) -> Dict[str, Any]:
+    """Returns the JSON-ready attribute dict stored on a graph node."""
+    metadata = node.metadata
+    return {
+        "id": node.id,
+        "type": node.type.value,
+        "name": node.name,
+        "metadata": {
+            "file_path": metadata.file_path,
+            "start_line": metadata.start_line,
+            "end_line": metadata.end_line,
+            "contains_dynamic_code": metadata.contains_dynamic_code,
+        },
+    }
+
+
 class GraphBuilder:
     def __init__(self):
         self.graph = nx.DiGraph()
 
-    def build(self, nodes: List[Node], edges: List[Edge]) -> nx.DiGraph:
-        for node in nodes:
-            self.graph.add_node(node.id, **node.model_dump(mode='json'))
-        for edge in edges:
-            self.graph.add_edge(edge.source, edge.target, type=edge.type.value)
+    def add(self, nodes: List[Node], edges: List[Edge]) -> None:
+        # The batched APIs avoid per-call overhead on large graphs.
+        self.graph.add_nodes_from((node.id, _node_attrs(node)) for node in nodes)
+        self.graph.add_edges_from(
+            (edge.source, edge.target, {"type": edge.type.value}) for edge in edges
+        )
+
+    def build(self, results: Iterable[Tuple[List[Node], List[Edge]]]) -> nx.DiGraph:
+        """
+        Builds the graph from a stream of per-file (nodes, edges) results.
+        Each batch is added as it arrives, so the full set of nodes and edges
+        is never held in memory next to the graph.
+        """
+        for nodes, edges in results:
+            self.add(nodes, edges)
         return self.graph
@@ -1,8 +1,6 @@
+from dataclasses import dataclass
 from enum import Enum
-from pathlib import Path
-from typing import Optional
-
-from pydantic import BaseModel
+from typing import Any, Dict, Optional
 
 
 class NodeType(str, Enum):
@@ -27,21 +25,42 @@ class EdgeType(str, Enum):
     USES_VARIABLE = "uses_variable"
 
 
-class NodeMetadata(BaseModel):
-    file_path: Path
+# The models below are plain slotted dataclasses rather than validated models:
+# parsers create them by the thousand per file, so construction must be cheap.
+# Conversion to and from plain dicts only happens at the process boundaries.
+
+
+@dataclass(slots=True)
+class NodeMetadata:
+    file_path: str  # Path relative to the project root, using forward slashes
     start_line: Optional[int] = None
     end_line: Optional[int] = None
     contains_dynamic_code: bool = False
 
 
-class Node(BaseModel):
+@dataclass(slots=True)
+class Node:
     id: str  # Unique identifier, e.g., "path/to/file.py:MyClass.my_method"
     type: NodeType
     name: str  # The short name, e.g., "my_method"
     metadata: NodeMetadata
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Node":
+        return cls(
+            id=data["id"],
+            type=NodeType(data["type"]),
+            name=data["name"],
+            metadata=NodeMetadata(**data["metadata"]),
+        )
 
-class Edge(BaseModel):
+
+@dataclass(slots=True)
+class Edge:
     source: str  # ID of the node with the dependency
     target: str  # ID of the node being depended upon
     type: EdgeType
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Edge":
+        return cls(source=data["source"], target=data["target"], type=EdgeType(data["type"]))
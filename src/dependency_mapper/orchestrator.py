@@ -2,13 +2,14 @@ import logging
 import multiprocessing
 import os
 import sys
-from functools import partial
 from pathlib import Path
-from typing import Iterable, List, Optional, Tuple
+from typing import FrozenSet, Iterable, Iterator, List, Optional, Tuple
 
+from .cache import CacheStore
 from .models import Edge, Node
+from .parsers.base import AbstractParser
 from .parsers.python_parser import PythonParser
-from .parsers.typescript_parser import TypeScriptParser
+from .parsers.typescript_parser import TypeScriptParser, get_ts_parser
 
 
 # A mapping from file extensions to their corresponding parser classes.
@@ -21,52 +22,171 @@ PARSER_MAPPING = {
 }
 
 
-def _parse_file_worker(file_path: Path, root_path: Path) -> Tuple[List[Node], List[Edge]]:
+# Per-process state, populated once by `_init_worker` when a worker starts.
+# Keeping the parsers alive lets each worker reuse the astroid cache (and any
+# other per-parser state) across all the files it is handed.
+_WORKER_STATE = {}
+
+
+def _init_worker(
+    root_path: Path, project_files: Optional[FrozenSet[str]], cache: Optional[CacheStore]
+) -> None:
+    """
+    Pool initializer that runs once in each worker process.
+    It prepares sys.path and creates one parser instance per parser class.
+    """
+    # sys.path modification is only needed for the Python parser, but it is
+    # cheap and only done once per process.
+    if str(root_path) not in sys.path:
+        sys.path.insert(0, str(root_path))
+
+    _WORKER_STATE["root_path"] = root_path
+    _WORKER_STATE["cache"] = cache
+    _WORKER_STATE["parsers"] = {
+        PythonParser: PythonParser(root_path, project_files=project_files),
+        TypeScriptParser: get_ts_parser(root_path),
+    }
+
+
+def _parse_file_worker(file_str: str) -> Tuple[List[Node], List[Edge]]:
     """
     A top-level function that can be pickled and sent to a worker process.
-    It dynamically selects the correct parser based on the file extension.
+    It selects the worker's cached parser based on the file extension.
+
+    Everything else the worker needs (root path, parsers) was set up once by
+    `_init_worker`, so each task only carries file paths, as plain strings
+    because they pickle much smaller and faster than Paths.
     """
+    file_path = Path(file_str)
     parser_class = PARSER_MAPPING.get(file_path.suffix)
 
     if not parser_class:
         logging.warning(f"No parser found for file type: {file_path.suffix}. Skipping.")
         return [], []
 
+    parser = _WORKER_STATE["parsers"][parser_class]
+    cache = _WORKER_STATE["cache"]
+    if cache is None:
+        return parser.parse(file_path, _WORKER_STATE["root_path"])
+
+    try:
+        key = _cache_key(cache, parser, file_path)
+    except OSError:
+        # Let the parser report the unreadable file.
+        return parser.parse(file_path, _WORKER_STATE["root_path"])
+
+    result = cache.get(key)
+    if result is None:
+        result = parser.parse(file_path, _WORKER_STATE["root_path"])
+        nodes, edges = result
+        # Every parsed file yields at least its file node; an empty result means
+        # parsing failed, and failures are retried (and reported) on every run.
+        if nodes or edges:
+            cache.put(key, result)
+    return result
+
+
+def _cache_key(cache: CacheStore, parser: AbstractParser, file_path: Path) -> str:
+    content = file_path.read_bytes()
+    if isinstance(parser, TypeScriptParser):
+        # A TS file's result also depends on the tsconfig it is compiled with.
+        tsconfig_path = parser.find_tsconfig(file_path)
+        if tsconfig_path is not None:
+            tsconfig = tsconfig_path.read_bytes()
+            return cache.key(file_path, content, str(tsconfig_path).encode("utf-8"), tsconfig)
+    return cache.key(file_path, content)
+
+
+def _parse_files_worker(file_strs: List[str]) -> List[Tuple[List[Node], List[Edge]]]:
+    """Parses a batch of files in one task, to amortize the IPC round-trips."""
+    return [_parse_file_worker(file_str) for file_str in file_strs]
+
+
+def _file_size(file_path: Path) -> int:
+    try:
+        return file_path.stat().st_size
+    except OSError:
+        return 0
+
+
+def _warm_astroid_cache(file_paths: List[Path], root_path: Path) -> None:
+    """
+    Parses the project's package `__init__.py` files in the parent process.
+    Forked workers inherit astroid's module cache (which is shared by all
+    AstroidManager instances) copy-on-write, so they start with these modules
+    already built instead of each re-parsing them on first import.
+    """
+    init_files = [p for p in file_paths if p.name == "__init__.py"]
+    if not init_files:
+        return
+
     original_sys_path = sys.path[:]
     try:
-        # sys.path modification is only needed for the Python parser.
-        if parser_class is PythonParser:
-            if str(root_path) not in sys.path:
-                sys.path.insert(0, str(root_path))
-        
-        # Each worker gets its own parser instance.
-        parser = parser_class(root_path)
-        return parser.parse(file_path, root_path)
+        # Needed so astroid derives the correct module names for the cache.
+        if str(root_path) not in sys.path:
+            sys.path.insert(0, str(root_path))
+
+        manager = PythonParser(root_path).manager
+        for init_file in init_files:
+            try:
+                manager.ast_from_file(str(init_file))
+            except Exception:
+                # Broken files are reported when the workers parse them.
+                continue
     finally:
         sys.path[:] = original_sys_path
 
 
 def run_parallel_parsing(
-    file_paths: Iterable[Path], root_path: Path, num_workers: Optional[int] = None
-) -> Tuple[List[Node], List[Edge]]:
+    file_paths: Iterable[Path],
+    root_path: Path,
+    num_workers: Optional[int] = None,
+    project_files: Optional[FrozenSet[str]] = None,
+    cache_dir: Optional[Path] = None,
+) -> Iterator[Tuple[List[Node], List[Edge]]]:
     """
     Manages a pool of worker processes to parse files in parallel.
+    Yields the (nodes, edges) of each file as soon as its worker finishes, so
+    the caller can consume results while parsing is still under way.
+
+    `project_files`, when given, is the set of source file paths (as strings)
+    that count as part of the project when resolving dependencies.
+
+    `cache_dir`, when given, enables the on-disk cache of per-file results
+    (see `CacheStore`).
     """
     if num_workers is None:
         num_workers = os.cpu_count()
 
-    all_nodes: List[Node] = []
-    all_edges: List[Edge] = []
+    # Hand out several files per task to amortize the IPC round-trips, while
+    # keeping enough batches per worker for the load to stay balanced. Files
+    # are dealt round-robin from largest to smallest, so every batch mixes
+    # sizes (rather than one batch holding all the largest files) and the
+    # batches handed out first are the heaviest.
+    file_paths = sorted(file_paths, key=_file_size, reverse=True)
+    file_strs = [str(p) for p in file_paths]
+    batch_size = max(1, len(file_strs) // (num_workers * 8))
+    num_batches = -(-len(file_strs) // batch_size)
+    batches = [file_strs[i::num_batches] for i in range(num_batches)]
 
-    # Use functools.partial to "bake in" the root_path argument for the worker.
-    worker_func = partial(_parse_file_worker, root_path=root_path)
+    cache = None
+    if cache_dir is not None:
+        namespace = CacheStore.make_namespace(root_path)
+        cache = CacheStore(cache_dir, namespace)
+        cache.remove_other_namespaces()
 
-    with multiprocessing.Pool(processes=num_workers) as pool:
-        # Use imap_unordered for efficiency, processing results as they complete.
-        results = pool.imap_unordered(worker_func, file_paths)
-        
-        for nodes, edges in results:
-            all_nodes.extend(nodes)
-            all_edges.extend(edges)
+    # Forked workers can inherit a warm astroid cache from this process. fork is
+    # only used on Linux; elsewhere it is unsafe or unavailable, and workers
+    # start from the platform's default method with an empty cache.
+    if sys.platform.startswith("linux"):
+        mp_context = multiprocessing.get_context("fork")
+        _warm_astroid_cache(file_paths, root_path)
+    else:
+        mp_context = multiprocessing.get_context()
 
-    return all_nodes, all_edges
+    with mp_context.Pool(
+        processes=num_workers, initializer=_init_worker, initargs=(root_path, project_files, cache)
+    ) as pool:
+        # Use imap_unordered for efficiency, processing results as they complete.
+        for results in pool.imap_unordered(_parse_files_worker, batches):
+            yield from results
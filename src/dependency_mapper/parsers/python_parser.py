@@ -1,6 +1,8 @@
+import builtins
 import logging
+import os
 from pathlib import Path
-from typing import List, Tuple
+from typing import FrozenSet, List, Optional, Tuple
 
 import astroid
 from astroid import nodes
@@ -12,11 +14,27 @@ from .base import AbstractParser
 
 DYNAMIC_FUNCTION_NAMES = {"eval", "exec", "getattr", "importlib.import_module"}
 
+_BUILTIN_NAMES = frozenset(dir(builtins))
 
-def _get_node_id(node: nodes.NodeNG, file_path: Path, root_path: Path) -> str:
-    relative_path = file_path.relative_to(root_path).as_posix()
+# Class bases and decorators may legitimately infer to several values, but
+# only the first few are linked.
+MAX_INFERENCES = 3
+
+
+def _infer_first(node: nodes.NodeNG) -> Optional[nodes.NodeNG]:
+    """Returns the first value astroid infers for a node, or None if inference fails."""
+    # astroid only caches an inference once its generator is exhausted, so all
+    # values are computed to let later references to the node reuse them.
+    try:
+        results = list(node.infer())
+    except astroid.InferenceError:
+        return None
+    return results[0] if results else None
+
+
+def _format_node_id(node: nodes.NodeNG, relative_path: str) -> str:
     if isinstance(node, nodes.Module):
-        return str(relative_path)
+        return relative_path
     try:
         return f"{relative_path}__{node.qname()}"
     except AttributeError:
@@ -25,37 +43,95 @@ def _get_node_id(node: nodes.NodeNG, file_path: Path, root_path: Path) -> str:
 
 
 class AstroidVisitor:
-    def __init__(self, file_path: Path, root_path: Path):
+    def __init__(
+        self, file_path: Path, root_path: Path, project_files: Optional[FrozenSet[str]] = None
+    ):
         self.file_path = file_path
         self.root_path = root_path
+        # Absolute paths of all project source files. When not provided, any
+        # file under the root path counts as part of the project.
+        self._project_files = project_files
         self._nodes: List[Node] = []
-        self._edges: List[Edge] = []
+        # The same edge is often found many times (e.g. every read of the same
+        # variable), so edges are deduplicated as they are added. Like the
+        # DiGraph they end up in, the last type seen for a pair wins; the dict
+        # also keeps the output order deterministic.
+        self._edge_types: dict[tuple[str, str], EdgeType] = {}
         self._scope_stack: List[str] = []
         self.dynamic_scope_ids: set[str] = set()
+        # The module being visited, i.e. the root() of every node we visit.
+        self._module_root: Optional[nodes.Module] = None
+        # Absolute file paths of project modules all start with this prefix.
+        self._root_prefix = str(self.root_path) + os.sep
+        self._relative_file_path = self.file_path.relative_to(self.root_path).as_posix()
+        # Caches keyed by id() of astroid nodes. The node itself is kept in the
+        # cached value so it stays alive and its id cannot be reused.
+        self._internal_cache: dict[int, tuple[nodes.NodeNG, bool, Optional[str]]] = {}
+        self._node_id_cache: dict[int, tuple[nodes.NodeNG, str]] = {}
+        # Exact node class -> visitor method. Classes not listed fall back to
+        # visiting their children.
+        self._dispatch = {
+            nodes.Module: self._visit_module,
+            nodes.ClassDef: self._visit_classdef,
+            nodes.FunctionDef: self._visit_functiondef,
+            nodes.AsyncFunctionDef: self._visit_asyncfunctiondef,
+            nodes.Call: self._visit_call,
+            nodes.Import: self._visit_import,
+            nodes.ImportFrom: self._visit_importfrom,
+            nodes.Assign: self._visit_assign,
+            nodes.AnnAssign: self._visit_annassign,
+            nodes.Attribute: self._visit_attribute,
+            nodes.Name: self._visit_name,
+        }
 
     def visit(self, module: nodes.Module):
         self._visit_recursive(module)
-        return self._nodes, self._edges, self.dynamic_scope_ids
+        edges = [
+            Edge(source=source_id, target=target_id, type=edge_type)
+            for (source_id, target_id), edge_type in self._edge_types.items()
+        ]
+        return self._nodes, edges, self.dynamic_scope_ids
 
     def _visit_recursive(self, node: nodes.NodeNG):
-        method_name = f"_visit_{node.__class__.__name__.lower()}"
-        visitor_method = getattr(self, method_name, self._default_visit)
-        visitor_method(node)
+        self._dispatch.get(type(node), self._default_visit)(node)
 
     def _default_visit(self, node: nodes.NodeNG):
         for child in node.get_children():
             self._visit_recursive(child)
 
+    def _is_project_file(self, file_str: str) -> bool:
+        if self._project_files is not None:
+            return file_str in self._project_files
+        return file_str.startswith(self._root_prefix)
+
+    def _relative_path(self, file_str: str) -> str:
+        """Converts an absolute path inside the project root to a relative POSIX path."""
+        return file_str[len(self._root_prefix):].replace(os.sep, "/")
+
+    def _get_node_id(self, node: nodes.NodeNG, file_str: Optional[str] = None) -> str:
+        """Returns the ID of a node, defaulting to one defined in the visited file."""
+        hit = self._node_id_cache.get(id(node))
+        if hit is not None:
+            return hit[1]
+
+        if file_str is None:
+            relative_path = self._relative_file_path
+        else:
+            relative_path = self._relative_path(file_str)
+
+        node_id = _format_node_id(node, relative_path)
+        self._node_id_cache[id(node)] = (node, node_id)
+        return node_id
+
     def _add_node(self, node: nodes.NodeNG, node_type: NodeType, name: str):
-        node_id = _get_node_id(node, self.file_path, self.root_path)
-        relative_file_path = self.file_path.relative_to(self.root_path).as_posix()
+        node_id = self._get_node_id(node)
         self._nodes.append(
             Node(
                 id=node_id,
                 type=node_type,
                 name=name,
                 metadata=NodeMetadata(
-                    file_path=relative_file_path,
+                    file_path=self._relative_file_path,
                     start_line=node.fromlineno,
                     end_line=node.tolineno,
                 ),
@@ -64,38 +140,70 @@ class AstroidVisitor:
         return node_id
 
     def _add_edge(self, source_id: str, target_id: str, edge_type: EdgeType):
-        self._edges.append(Edge(source=source_id, target=target_id, type=edge_type))
-
-    def _is_internal_project_symbol(self, inferred: nodes.NodeNG) -> bool:
-        """Checks if an inferred node is part of the user's project and not a built-in."""
+        self._edge_types[(source_id, target_id)] = edge_type
+
+    def _is_internal_project_symbol(self, inferred: nodes.NodeNG) -> Tuple[bool, Optional[str]]:
+        """
+        Checks if an inferred node is part of the user's project and not a built-in.
+        Returns the check result along with the absolute path of the file
+        defining the node, when it is internal.
+        """
         if inferred is astroid.Uninferable:
-            return False
+            return False, None
 
+        # The same inferred nodes (imported classes, functions, modules) are hit
+        # over and over while visiting a file, so remember the answer.
+        hit = self._internal_cache.get(id(inferred))
+        if hit is not None:
+            return hit[1], hit[2]
+
+        is_internal, inferred_file = self._check_internal_project_symbol(inferred)
+        self._internal_cache[id(inferred)] = (inferred, is_internal, inferred_file)
+        return is_internal, inferred_file
+
+    def _check_internal_project_symbol(self, inferred: nodes.NodeNG) -> Tuple[bool, Optional[str]]:
         # Add a direct check for built-ins before checking the root.
         try:
             if inferred.qname().startswith('builtins.'):
-                return False
+                return False, None
         except AttributeError:
             # Not all nodes have a qname, which is fine.
             pass
 
         root = inferred.root()
         if not hasattr(root, 'name'):
-            return False
+            return False, None
 
         # Filter out built-in types and functions
         if root.name == 'builtins':
-            return False
+            return False, None
 
         # Ensure it has a file path and the path is within our project root
-        if hasattr(root, 'file') and root.file:
-            inferred_file = Path(root.file)
-            if str(inferred_file).startswith(str(self.root_path)):
+        inferred_file = getattr(root, 'file', None)
+        if inferred_file and self._is_project_file(inferred_file):
+            return True, inferred_file
+
+        return False, None
+
+    def _is_builtin_reference(self, node: nodes.NodeNG) -> bool:
+        """
+        Cheap textual check for a bare name referring to a builtin, so inference
+        can be skipped for it: builtins never produce edges. A binding of the
+        name in any enclosing scope (assignment, parameter, import, definition)
+        shadows the builtin and makes this False.
+        """
+        if not isinstance(node, nodes.Name) or node.name not in _BUILTIN_NAMES:
+            return False
+        scope = node.scope()
+        while True:
+            if node.name in scope.locals:
+                return False
+            if scope.parent is None:
                 return True
-        
-        return False
+            scope = scope.parent.scope()
 
     def _visit_module(self, node: nodes.Module):
+        self._module_root = node
         module_id = self._add_node(node, NodeType.FILE, node.name)
         self._scope_stack.append(module_id)
         self._default_visit(node)
@@ -108,20 +216,20 @@ class AstroidVisitor:
         if node.decorators:
             for decorator in node.decorators.nodes:
                 try:
-                    for inferred in decorator.infer():
-                        if self._is_internal_project_symbol(inferred):
-                            inferred_file = Path(inferred.root().file)
-                            target_id = _get_node_id(inferred, inferred_file, self.root_path)
+                    for inferred in list(decorator.infer())[:MAX_INFERENCES]:
+                        is_internal, inferred_file = self._is_internal_project_symbol(inferred)
+                        if is_internal:
+                            target_id = self._get_node_id(inferred, inferred_file)
                             self._add_edge(class_id, target_id, EdgeType.DECORATES)
                 except astroid.InferenceError:
                     continue
 
         for base in node.bases:
             try:
-                for inferred in base.infer():
-                    if self._is_internal_project_symbol(inferred):
-                        inferred_file = Path(inferred.root().file)
-                        target_id = _get_node_id(inferred, inferred_file, self.root_path)
+                for inferred in list(base.infer())[:MAX_INFERENCES]:
+                    is_internal, inferred_file = self._is_internal_project_symbol(inferred)
+                    if is_internal:
+                        target_id = self._get_node_id(inferred, inferred_file)
                         self._add_edge(class_id, target_id, EdgeType.INHERITS)
             except astroid.InferenceError:
                 continue
@@ -137,10 +245,10 @@ class AstroidVisitor:
         if node.decorators:
             for decorator in node.decorators.nodes:
                 try:
-                    for inferred in decorator.infer():
-                        if self._is_internal_project_symbol(inferred):
-                            inferred_file = Path(inferred.root().file)
-                            target_id = _get_node_id(inferred, inferred_file, self.root_path)
+                    for inferred in list(decorator.infer())[:MAX_INFERENCES]:
+                        is_internal, inferred_file = self._is_internal_project_symbol(inferred)
+                        if is_internal:
+                            target_id = self._get_node_id(inferred, inferred_file)
                             self._add_edge(func_id, target_id, EdgeType.DECORATES)
                 except astroid.InferenceError:
                     continue
@@ -163,52 +271,51 @@ class AstroidVisitor:
 
     def _visit_call(self, node: nodes.Call):
         caller_id = self._scope_stack[-1]
-        try:
-            for inferred in node.func.infer():
-                if inferred is astroid.Uninferable:
-                    continue
+        if self._is_builtin_reference(node.func):
+            # Flag dynamic calls without paying for inference.
+            if node.func.name in DYNAMIC_FUNCTION_NAMES:
+                self.dynamic_scope_ids.add(caller_id)
+            self._default_visit(node)
+            return
+
+        # Only the first inference is used; calls we can't resolve are ignored.
+        inferred = _infer_first(node.func)
+        if inferred is not None and inferred is not astroid.Uninferable:
+            # Flag dynamic calls
+            try:
+                if inferred.qname() in DYNAMIC_FUNCTION_NAMES:
+                    self.dynamic_scope_ids.add(caller_id)
+            except AttributeError:
+                # Not a function/method with qname, so can't be one of our dynamic targets.
+                pass
 
-                # Flag dynamic calls
-                try:
-                    if inferred.qname() in DYNAMIC_FUNCTION_NAMES:
-                        self.dynamic_scope_ids.add(caller_id)
-                except AttributeError:
-                    # Not a function/method with qname, so can't be one of our dynamic targets.
-                    pass
-
-                # Create CALLS edge for internal calls
-                if self._is_internal_project_symbol(inferred):
-                    inferred_file = Path(inferred.root().file)
-                    target_id = _get_node_id(inferred, inferred_file, self.root_path)
-                    if caller_id != target_id:
-                        self._add_edge(caller_id, target_id, EdgeType.CALLS)
-        except astroid.InferenceError:
-            pass  # Ignore calls we can't resolve
+            # Create CALLS edge for internal calls
+            is_internal, inferred_file = self._is_internal_project_symbol(inferred)
+            if is_internal:
+                target_id = self._get_node_id(inferred, inferred_file)
+                if caller_id != target_id:
+                    self._add_edge(caller_id, target_id, EdgeType.CALLS)
         self._default_visit(node)
 
     def _visit_import(self, node: nodes.Import):
-        current_file_id = _get_node_id(node.root(), self.file_path, self.root_path)
+        current_file_id = self._get_node_id(self._module_root)
         for name, _ in node.names:
             try:
-                module = node.root().import_module(name)
-                if module.file:
-                    target_file = Path(module.file)
-                    if str(target_file).startswith(str(self.root_path)):
-                        relative_target = target_file.relative_to(self.root_path).as_posix()
-                        self._add_edge(current_file_id, str(relative_target), EdgeType.IMPORTS)
+                module = self._module_root.import_module(name)
+                if module.file and self._is_project_file(module.file):
+                    relative_target = self._relative_path(module.file)
+                    self._add_edge(current_file_id, relative_target, EdgeType.IMPORTS)
             except (astroid.AstroidError, ImportError):
                 continue
 
     def _visit_importfrom(self, node: nodes.ImportFrom):
-        current_file_id = _get_node_id(node.root(), self.file_path, self.root_path)
+        current_file_id = self._get_node_id(self._module_root)
         try:
             # Pass the level for correct relative import resolution
-            module = node.root().import_module(node.modname, level=node.level)
-            if module.file:
-                target_file = Path(module.file)
-                if str(target_file).startswith(str(self.root_path)):
-                    relative_target = target_file.relative_to(self.root_path).as_posix()
-                    self._add_edge(current_file_id, str(relative_target), EdgeType.IMPORTS)
+            module = self._module_root.import_module(node.modname, level=node.level)
+            if module.file and self._is_project_file(module.file):
+                relative_target = self._relative_path(module.file)
+                self._add_edge(current_file_id, relative_target, EdgeType.IMPORTS)
         except (astroid.AstroidError, ImportError):
             pass
 
@@ -236,79 +343,81 @@ class AstroidVisitor:
         self._default_visit(node)
 
     def _handle_annotation(self, source_id: str, annotation_node: nodes.NodeNG):
-        """Recursively traverses type hints to find all nested type dependencies."""
-        # Base case: A simple name or attribute access (e.g., 'User' or 'models.User')
-        if isinstance(annotation_node, (nodes.Name, nodes.Attribute)):
-            try:
-                for inferred in annotation_node.infer():
-                    if self._is_internal_project_symbol(inferred):
-                        inferred_file = Path(inferred.root().file)
-                        target_id = _get_node_id(inferred, inferred_file, self.root_path)
+        """Traverses type hints to find all nested type dependencies."""
+        # An explicit stack instead of recursion; children are pushed in reverse
+        # so they are still visited left to right.
+        stack = [annotation_node]
+        while stack:
+            annotation_node = stack.pop()
+            # Leaf: A simple name or attribute access (e.g., 'User' or 'models.User')
+            if isinstance(annotation_node, (nodes.Name, nodes.Attribute)):
+                inferred = _infer_first(annotation_node)
+                if inferred is not None:
+                    is_internal, inferred_file = self._is_internal_project_symbol(inferred)
+                    if is_internal:
+                        target_id = self._get_node_id(inferred, inferred_file)
                         self._add_edge(source_id, target_id, EdgeType.USES_TYPE)
-            except astroid.InferenceError:
-                pass
-        # Recursive case 1: Generic types (e.g., List[User])
-        elif isinstance(annotation_node, nodes.Subscript):
-            # Recurse on the container (e.g., 'List')
-            self._handle_annotation(source_id, annotation_node.value)
-            # Recurse on the contents (e.g., 'User')
-            self._handle_annotation(source_id, annotation_node.slice)
-        # Recursive case 2: Multiple types inside a generic (e.g., the (str, int) in Dict[str, int])
-        elif isinstance(annotation_node, nodes.Tuple):
-            for element_node in annotation_node.elts:
-                self._handle_annotation(source_id, element_node)
-        # Recursive case 3: Union types using the '|' operator (e.g., User | None)
-        elif isinstance(annotation_node, nodes.BinOp) and annotation_node.op == '|':
-            self._handle_annotation(source_id, annotation_node.left)
-            self._handle_annotation(source_id, annotation_node.right)
+            # Generic types (e.g., List[User]): the container, then its contents
+            elif isinstance(annotation_node, nodes.Subscript):
+                stack.append(annotation_node.slice)
+                stack.append(annotation_node.value)
+            # Multiple types inside a generic (e.g., the (str, int) in Dict[str, int])
+            elif isinstance(annotation_node, nodes.Tuple):
+                stack.extend(reversed(annotation_node.elts))
+            # Union types using the '|' operator (e.g., User | None)
+            elif isinstance(annotation_node, nodes.BinOp) and annotation_node.op == '|':
+                stack.append(annotation_node.right)
+                stack.append(annotation_node.left)
 
     def _visit_attribute(self, node: nodes.Attribute):
         """Creates USES_VARIABLE edges for attribute access."""
-        try:
-            for inferred in node.infer():
-                if inferred is not astroid.Uninferable:
-                    # We are interested in attributes that are variables (AssignName for module/class level, AssignAttr for instance level)
-                    if isinstance(inferred, (nodes.AssignName, nodes.AssignAttr)):
-                        # Check if it's an internal project symbol
-                        if self._is_internal_project_symbol(inferred):
-                            inferred_file = Path(inferred.root().file)
-                            target_id = _get_node_id(inferred, inferred_file, self.root_path)
-                            source_id = self._scope_stack[-1]
-                            if source_id != target_id:
-                                self._add_edge(source_id, target_id, EdgeType.USES_VARIABLE)
-        except astroid.InferenceError:
-            pass
+        # Attributes of builtins (e.g. str.join) are never project variables.
+        if self._is_builtin_reference(node.expr):
+            self._default_visit(node)
+            return
+
+        inferred = _infer_first(node)
+        # We are interested in attributes that are variables (AssignName for module/class level, AssignAttr for instance level)
+        if isinstance(inferred, (nodes.AssignName, nodes.AssignAttr)):
+            # Check if it's an internal project symbol
+            is_internal, inferred_file = self._is_internal_project_symbol(inferred)
+            if is_internal:
+                target_id = self._get_node_id(inferred, inferred_file)
+                source_id = self._scope_stack[-1]
+                if source_id != target_id:
+                    self._add_edge(source_id, target_id, EdgeType.USES_VARIABLE)
         self._default_visit(node)
 
     def _visit_name(self, node: nodes.Name):
         """Creates USES_VARIABLE edges when a variable is read."""
-        # We only care about variables being loaded (read), not stored or deleted.
-        if isinstance(node.lookup(node.name)[1][0], (nodes.AssignName, nodes.AssignAttr)):
-            try:
-                for inferred in node.infer():
-                    if inferred is not astroid.Uninferable:
-                        # Ensure we are linking to a variable, not a function or class
-                        if isinstance(inferred, (nodes.AssignName, nodes.AssignAttr, nodes.Const)):
-                            if self._is_internal_project_symbol(inferred):
-                                inferred_file = Path(inferred.root().file)
-                                target_id = _get_node_id(inferred, inferred_file, self.root_path)
-                                source_id = self._scope_stack[-1]
-                                if source_id != target_id:
-                                    self._add_edge(source_id, target_id, EdgeType.USES_VARIABLE)
-            except astroid.InferenceError:
-                pass
+        # Name nodes are always loads (stores and deletes are AssignName and
+        # DelName), and inference already resolves the name through its scopes,
+        # so no separate lookup() is needed before inferring.
+        if self._is_builtin_reference(node):
+            return
+
+        inferred = _infer_first(node)
+        # Ensure we are linking to a variable, not a function or class
+        if isinstance(inferred, (nodes.AssignName, nodes.AssignAttr, nodes.Const)):
+            is_internal, inferred_file = self._is_internal_project_symbol(inferred)
+            if is_internal:
+                target_id = self._get_node_id(inferred, inferred_file)
+                source_id = self._scope_stack[-1]
+                if source_id != target_id:
+                    self._add_edge(source_id, target_id, EdgeType.USES_VARIABLE)
         self._default_visit(node)
 
 
 class PythonParser(AbstractParser):
-    def __init__(self, root_path: Path):
+    def __init__(self, root_path: Path, project_files: Optional[FrozenSet[str]] = None):
         self.root_path = root_path
+        self.project_files = project_files
         self.manager = AstroidManager()
 
     def parse(self, file_path: Path, root_path: Path) -> Tuple[List[Node], List[Edge]]:
         try:
             module = self.manager.ast_from_file(str(file_path))
-            visitor = AstroidVisitor(file_path, self.root_path)
+            visitor = AstroidVisitor(file_path, self.root_path, self.project_files)
             nodes, edges, dynamic_scope_ids = visitor.visit(module)
 
             # Apply dynamic code flags to the metadata of the relevant nodes
@@ -1,12 +1,22 @@
+import atexit
+import functools
 import json
 import logging
+import os
+import struct
 import subprocess
+import threading
 from pathlib import Path
 from typing import List, Optional, Tuple
 
 from ..models import Edge, Node
 from .base import AbstractParser
 
+try:
+    import orjson
+except ImportError:  # Optional speed-up, see the "fast" extra.
+    orjson = None
+
 
 PRIORITIZED_TSCONFIG_NAMES = [
     "tsconfig.app.json",
@@ -15,81 +25,161 @@ PRIORITIZED_TSCONFIG_NAMES = [
 ]
 
 
-def _find_tsconfig(start_path: Path) -> Optional[Path]:
-    """
-    Walks up from a starting path to find a prioritized tsconfig file.
+class TypeScriptParser(AbstractParser):
     """
-    current_dir = start_path.parent
-    while current_dir != current_dir.parent:  # Stop at the root
-        for config_name in PRIORITIZED_TSCONFIG_NAMES:
-            tsconfig_path = current_dir / config_name
-            if tsconfig_path.is_file():
-                return tsconfig_path
-        current_dir = current_dir.parent
-    return None
+    Parses TypeScript/JavaScript files through a long-lived Node.js process
+    running `ts_parser/index.js --server`. The process is started on first use
+    and receives one JSON request line per file, so Node's startup cost and the
+    ts-morph project are paid once instead of once per file. Each response is
+    framed as a 4-byte little-endian length followed by that many bytes of
+    UTF-8 JSON, which is decoded straight from bytes.
 
+    Files are parsed in parallel by the orchestrator's worker processes, each
+    of which owns one parser and therefore one server. A parser may also be
+    shared between threads: requests to its server are serialized by a lock.
+    """
 
-class TypeScriptParser(AbstractParser):
     def __init__(self, root_path: Path):
         self.root_path = root_path
         # Define the path to the Node.js parser script relative to this project's structure
         self.parser_script_path = Path(__file__).parent.parent / "ts_parser" / "index.js"
+        self._proc: Optional[subprocess.Popen] = None
+        # The process that started `_proc`; a forked child must not share it.
+        self._proc_owner_pid: Optional[int] = None
+        # Guards the server's stdin/stdout pair, so each response is read by
+        # the thread that sent the matching request.
+        self._lock = threading.Lock()
+        # Maps each directory visited so far to the tsconfig governing it.
+        self._tsconfig_cache: dict[Path, Optional[Path]] = {}
+
+    def find_tsconfig(self, start_path: Path) -> Optional[Path]:
+        """
+        Walks up from a starting path to find a prioritized tsconfig file.
+        Results, including misses, are cached for every directory on the way,
+        so sibling and descendant files resolve without touching the disk.
+        """
+        visited = []
+        found = None
+        current_dir = start_path.parent
+        while current_dir != current_dir.parent:  # Stop at the root
+            if current_dir in self._tsconfig_cache:
+                found = self._tsconfig_cache[current_dir]
+                break
+            visited.append(current_dir)
+            for config_name in PRIORITIZED_TSCONFIG_NAMES:
+                tsconfig_path = current_dir / config_name
+                if tsconfig_path.is_file():
+                    found = tsconfig_path
+                    break
+            if found:
+                break
+            current_dir = current_dir.parent
+
+        for directory in visited:
+            self._tsconfig_cache[directory] = found
+        return found
+
+    def _ensure_server(self) -> subprocess.Popen:
+        if self._proc is not None and self._proc_owner_pid != os.getpid():
+            # Inherited across a fork: leave the server to the parent process.
+            self._proc = None
+        if self._proc is None or self._proc.poll() is not None:
+            self._proc = subprocess.Popen(
+                ["node", str(self.parser_script_path), "--server"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                # Left attached to our stderr: an unread pipe could fill up and
+                # block the server. Parse errors come back in the response.
+                stderr=None,
+            )
+            self._proc_owner_pid = os.getpid()
+            atexit.register(self.close)
+        return self._proc
+
+    def close(self) -> None:
+        """Stops the Node.js server, if it is running."""
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        atexit.unregister(self.close)
+        try:
+            # Closing stdin ends the server's read loop, so it exits on its own.
+            proc.stdin.close()
+            proc.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            proc.kill()
+            proc.wait()
+
+    def _request(self, request: dict) -> dict:
+        with self._lock:
+            proc = self._ensure_server()
+            try:
+                proc.stdin.write(json.dumps(request).encode("utf-8") + b"\n")
+                proc.stdin.flush()
+                header = proc.stdout.read(4)
+                payload = b""
+                if len(header) == 4:
+                    (length,) = struct.unpack("<I", header)
+                    payload = proc.stdout.read(length)
+            except OSError as e:
+                self.close()
+                raise RuntimeError(f"TS parser server is not reachable: {e}") from e
+            # A short read means the server exited mid-response.
+            if len(header) != 4 or len(payload) != length:
+                self.close()
+                raise RuntimeError("TS parser server exited unexpectedly.")
+        if orjson is not None:
+            return orjson.loads(payload)
+        return json.loads(payload)
 
     def parse(self, file_path: Path, root_path: Path) -> Tuple[List[Node], List[Edge]]:
-        tsconfig_path = _find_tsconfig(file_path)
+        tsconfig_path = self.find_tsconfig(file_path)
         if not tsconfig_path:
             logging.warning(f"Could not find a tsconfig.json for {file_path}. Skipping.")
             return [], []
 
-        command = [
-            "node",
-            str(self.parser_script_path),
-            "--filePath",
-            str(file_path),
-            "--rootPath",
-            str(self.root_path),
-            "--tsconfigPath",
-            str(tsconfig_path),
-        ]
+        request = {
+            "filePath": str(file_path),
+            "rootPath": str(self.root_path),
+            "tsconfigPath": str(tsconfig_path),
+        }
 
         try:
-            process = subprocess.run(
-                command,
-                capture_output=True,
-                text=True,
-                check=True,
-                encoding="utf-8",
-            )
+            result = self._request(request)
 
-            if process.stderr:
-                logging.warning(
-                    f"TS parser produced warnings for {file_path}:\n{process.stderr}"
+            if "error" in result:
+                logging.error(
+                    f"Failed to parse TypeScript file {file_path}.\n"
+                    f"Error: {result['error']}"
                 )
+                return [], []
 
-            result = json.loads(process.stdout)
-            
-            nodes = [Node(**node_data) for node_data in result.get("nodes", [])]
-            edges = [Edge(**edge_data) for edge_data in result.get("edges", [])]
-            
-            # The TS parser returns an array of scope IDs. We need to apply this flag.
+            # The TS parser returns an array of scope IDs whose nodes contain
+            # dynamic code; the flag is set as each node is built.
             dynamic_scope_ids = set(result.get("dynamicScopeIds", []))
-            if dynamic_scope_ids:
-                for node in nodes:
-                    if node.id in dynamic_scope_ids:
-                        node.metadata.contains_dynamic_code = True
+            nodes = []
+            for node_data in result.get("nodes", []):
+                node = Node.from_dict(node_data)
+                if node.id in dynamic_scope_ids:
+                    node.metadata.contains_dynamic_code = True
+                nodes.append(node)
+            edges = [Edge.from_dict(edge_data) for edge_data in result.get("edges", [])]
 
             return nodes, edges
 
-        except subprocess.CalledProcessError as e:
-            logging.error(
-                f"Failed to parse TypeScript file {file_path}.\n"
-                f"Command: {' '.join(command)}\n"
-                f"Error: {e.stderr}"
-            )
-            return [], []
-        except json.JSONDecodeError as e:
+        except ValueError as e:  # json.JSONDecodeError and orjson.JSONDecodeError
             logging.error(f"Failed to decode JSON from TS parser for {file_path}: {e}")
             return [], []
         except Exception as e:
             logging.error(f"An unexpected error occurred while parsing {file_path}: {e}")
             return [], []
+
+
+@functools.lru_cache(maxsize=None)
+def get_ts_parser(root_path: Path) -> TypeScriptParser:
+    """
+    Returns the process-wide TypeScriptParser for `root_path`, so its Node.js
+    server and tsconfig cache are shared by every caller instead of being
+    started and rebuilt per parser instance.
+    """
+    return TypeScriptParser(root_path)
@@ -1,34 +1,83 @@
 import json
+from typing import Any
 
 import networkx as nx
 from networkx.readwrite import json_graph
 
+try:
+    import orjson
+except ImportError:  # Optional speed-up, see the "fast" extra.
+    orjson = None
+
+
+def _node_link_data(graph: nx.DiGraph) -> dict:
+    """
+    Same result as `json_graph.node_link_data(graph, edges="links")`, but
+    reuses node attribute dicts that already carry a matching "id" (as the
+    ones from GraphBuilder do) instead of copying every one of them.
+    """
+    if graph.is_multigraph():
+        return json_graph.node_link_data(graph, edges="links")
+    return {
+        "directed": graph.is_directed(),
+        "multigraph": False,
+        "graph": graph.graph,
+        "nodes": [
+            data if data.get("id") == node else {**data, "id": node}
+            for node, data in graph.nodes(data=True)
+        ],
+        "links": [
+            {**data, "source": source, "target": target}
+            for source, target, data in graph.edges(data=True)
+        ],
+    }
+
 
 class JsonSerializer:
     def serialize(self, graph: nx.DiGraph, indent: int = 2) -> str:
-        # Explicitly set edges="links" to preserve current behavior and remove the warning.
-        data = json_graph.node_link_data(graph, edges="links")
-        return json.dumps(data, indent=indent)
+        return self.serialize_bytes(graph, indent=indent).decode("utf-8")
+
+    def serialize_bytes(self, graph: nx.DiGraph, indent: int = 2) -> bytes:
+        """Serializes the graph to UTF-8 encoded JSON, using orjson when available."""
+        data = _node_link_data(graph)
+        # orjson only supports two-space indentation.
+        if orjson is not None and indent in (None, 2):
+            option = orjson.OPT_NON_STR_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(data, option=option)
+        return json.dumps(data, indent=indent).encode("utf-8")
+
+
+_DOT_ESCAPES = {ord('"'): '\\"', ord("\n"): "\\n", ord("\r"): "\\r"}
+
+
+def _dot_quote(value: Any) -> str:
+    """Quotes a DOT identifier, escaping the same characters pydot does."""
+    return '"' + str(value).translate(_DOT_ESCAPES) + '"'
 
 
 class DotSerializer:
     def serialize(self, graph: nx.DiGraph) -> str:
         """Serializes the graph to the DOT language format."""
-        try:
-            from networkx.drawing.nx_pydot import to_pydot
-        except ImportError as e:
-            raise ImportError(
-                "DOT serialization requires pydot. Please install it using: pip install pydot"
-            ) from e
-        
-        # Create a copy to modify for visualization without affecting the original graph
-        viz_graph = graph.copy()
-
-        # Keep only the simple name for cleaner labels
-        for node, data in viz_graph.nodes(data=True):
-            data['label'] = data.get('name', node).split(':')[-1] # Show simple name
-            if 'name' in data:
-                del data['name']
-
-        pydot_graph = to_pydot(viz_graph)
-        return pydot_graph.to_string()
+        # Written directly in a single pass over the graph, instead of building
+        # a pydot object per node and edge only to render them to text. Every
+        # identifier is quoted, which is always valid DOT.
+        strict = nx.number_of_selfloops(graph) == 0 and not graph.is_multigraph()
+        lines = ["strict digraph {" if strict else "digraph {"]
+
+        for node, data in graph.nodes(data=True):
+            attrs = [f"{key}={_dot_quote(value)}" for key, value in data.items() if key != "name"]
+            # Keep only the simple name for cleaner labels
+            attrs.append(f"label={_dot_quote(str(data.get('name', node)).rsplit(':', 1)[-1])}")
+            lines.append(f"{_dot_quote(node)} [{', '.join(attrs)}];")
+
+        for source, target, data in graph.edges(data=True):
+            edge = f"{_dot_quote(source)} -> {_dot_quote(target)}"
+            if data:
+                attrs = ", ".join(f"{key}={_dot_quote(value)}" for key, value in data.items())
+                edge += f" [{attrs}]"
+            lines.append(edge + ";")
+
+        lines.append("}\n")
+        return "\n".join(lines)
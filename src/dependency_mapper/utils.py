@@ -1,4 +1,13 @@
+import functools
 import shutil
+from typing import Optional
+
+
+@functools.lru_cache(maxsize=None)
+def _which(command: str) -> Optional[str]:
+    # PATH lookups stat every candidate directory; the answer doesn't change
+    # while the process runs, so it is only looked up once per command.
+    return shutil.which(command)
 
 
 def check_command_installed(command: str) -> None:
@@ -6,7 +15,7 @@ def check_command_installed(command: str) -> None:
     Checks if a command is available in the system's PATH.
     Raises a RuntimeError if the command is not found.
     """
-    if shutil.which(command) is None:
+    if _which(command) is None:
         raise RuntimeError(
             f"Command '{command}' not found in PATH. "
             f"Please ensure it is installed and accessible to run the parser."
@@ -1,10 +1,85 @@
 import fnmatch
+import functools
+import os
+import queue
+import re
 import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Generator, List
+from typing import BinaryIO, Generator, List, Optional, Tuple
+
+import pathspec
 
 DEFAULT_IGNORE_PATTERNS = [".*", "__pycache__", "build", "dist", "*.egg-info", "venv", ".venv", "node_modules"]
 SUPPORTED_EXTENSIONS = {".py", ".js", ".ts", ".jsx", ".tsx"}
+_SUPPORTED_EXTENSIONS_BYTES = {os.fsencode(ext) for ext in SUPPORTED_EXTENSIONS}
+
+# The .gitignore specs in effect for a directory, outermost first, each paired
+# with the directory its patterns are relative to.
+_GitIgnoreRules = Tuple[Tuple[str, pathspec.GitIgnoreSpec], ...]
+
+
+def _load_gitignore(dir_path: str) -> Optional[pathspec.GitIgnoreSpec]:
+    return _load_ignore_file(os.path.join(dir_path, ".gitignore"))
+
+
+def _load_ignore_file(file_path: str) -> Optional[pathspec.GitIgnoreSpec]:
+    try:
+        with open(file_path, encoding="utf-8", errors="replace") as f:
+            spec = pathspec.GitIgnoreSpec.from_lines(f)
+    except OSError:
+        return None
+    return spec if spec.patterns else None
+
+
+@functools.lru_cache(maxsize=None)
+def _git_exclude_rules(repo_root: str) -> _GitIgnoreRules:
+    """
+    Loads the repository-wide exclude files git applies besides .gitignore:
+    core.excludesFile, then .git/info/exclude, which takes precedence. Their
+    patterns are relative to the repository root. Empty if `repo_root` is not
+    a git repository or git is not available.
+    """
+    def git(*args: str) -> Optional[str]:
+        try:
+            result = subprocess.run(
+                ["git", *args], cwd=repo_root, capture_output=True, text=True, check=True
+            )
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return None
+        return result.stdout.strip()
+
+    info_exclude = git("rev-parse", "--git-path", "info/exclude")
+    if info_exclude is None:
+        return ()
+    excludes_file = git("config", "--path", "--get", "core.excludesFile")
+    if not excludes_file:
+        # git's default when core.excludesFile is unset.
+        config_home = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+        excludes_file = os.path.join(config_home, "git", "ignore")
+
+    rules = ()
+    for exclude_path in (excludes_file, info_exclude):
+        spec = _load_ignore_file(os.path.join(repo_root, exclude_path))
+        if spec is not None:
+            rules += ((repo_root, spec),)
+    return rules
+
+
+def _is_gitignored(path: str, is_dir: bool, rules: _GitIgnoreRules) -> bool:
+    # As in git, the deepest .gitignore with a matching pattern decides, so a
+    # nested file can re-include what an outer one excludes.
+    for base_path, spec in reversed(rules):
+        relative_path = path[len(base_path) + 1 :]
+        if os.sep != "/":
+            relative_path = relative_path.replace(os.sep, "/")
+        if is_dir:
+            relative_path += "/"
+        ignored = spec.check_file(relative_path).include
+        if ignored is not None:
+            return ignored
+    return False
 
 
 class GitFileWalker:
@@ -12,45 +87,209 @@ class GitFileWalker:
         self.root_path = root_path
 
     def walk(self) -> Generator[Path, None, None]:
+        # -z lists raw NUL-terminated paths: no quoting of unusual names and
+        # no decoding of paths that will be filtered out anyway. --directory
+        # reports a wholly untracked directory as one "dir/" entry instead of
+        # listing every file below it. The listing is read-only, so git is told
+        # not to take optional locks that could contend with the user's own git
+        # commands, and to load the index in parallel.
+        cmd = [
+            "git",
+            "--no-optional-locks",
+            "-c",
+            "core.preloadindex=true",
+            "ls-files",
+            "-z",
+            "--cached",
+            "--others",
+            "--exclude-standard",
+            "--directory",
+            "--no-empty-directory",
+        ]
         try:
-            cmd = ["git", "ls-files", "--cached", "--others", "--exclude-standard"]
-            result = subprocess.run(
+            # Read git's output as it is produced rather than waiting for it to
+            # exit, so the first paths reach the caller early.
+            process = subprocess.Popen(
                 cmd,
                 cwd=self.root_path,
-                capture_output=True,
-                text=True,
-                check=True,
-                encoding="utf-8",
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
             )
-            for line in result.stdout.strip().split("\n"):
-                if line and Path(line).suffix in SUPPORTED_EXTENSIONS:
-                    yield self.root_path / line
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            # Fallback to FileSystemWalker if git is not available or it's not a repo
+        except FileNotFoundError:
+            # Fallback to FileSystemWalker if git is not available
             yield from FileSystemWalker(self.root_path).walk()
+            return
+
+        yielded = False
+        try:
+            for raw_path in _split_nul(process.stdout):
+                if raw_path.endswith(b"/"):
+                    dir_path = self.root_path / os.fsdecode(raw_path[:-1])
+                    for file_path in self._walk_untracked_dir(dir_path):
+                        yielded = True
+                        yield file_path
+                    continue
+                # Test the suffix on the raw bytes; only matches are decoded.
+                dot = raw_path.rfind(b".")
+                if dot != -1 and raw_path[dot:] in _SUPPORTED_EXTENSIONS_BYTES:
+                    yielded = True
+                    yield self.root_path / os.fsdecode(raw_path)
+        finally:
+            # If the caller stopped early, closing the pipe makes git exit.
+            process.stdout.close()
+            returncode = process.wait()
+
+        if returncode != 0:
+            if yielded:
+                raise subprocess.CalledProcessError(returncode, cmd)
+            # Fallback to FileSystemWalker if it's not a repo
+            yield from FileSystemWalker(self.root_path).walk()
+
+    def _walk_untracked_dir(self, dir_path: Path) -> Generator[Path, None, None]:
+        # git also reports nested repositories as "dir/"; their files were never
+        # part of the listing.
+        if (dir_path / ".git").exists():
+            return
+        # Untracked sources still count. They are filtered by git's ignore rules
+        # only, exactly as when git listed their files one by one, so the
+        # default ignore patterns are not applied here.
+        yield from FileSystemWalker(dir_path, ignore_patterns=[], gitignore_root=self.root_path).walk()
+
+
+def _split_nul(stream: BinaryIO, chunk_size: int = 65536) -> Generator[bytes, None, None]:
+    """Yields the non-empty NUL-terminated records of a binary stream as they arrive."""
+    tail = b""
+    for chunk in iter(lambda: stream.read1(chunk_size), b""):
+        records = (tail + chunk).split(b"\0")
+        tail = records.pop()
+        yield from filter(None, records)
+    if tail:
+        yield tail
 
 
 class FileSystemWalker:
-    def __init__(self, root_path: Path, ignore_patterns: List[str] = None):
+    """
+    Walks the directory tree directly, for when git is not available.
+
+    Besides `ignore_patterns`, the .gitignore files found along the way are
+    honored like git does: each applies to its own directory's subtree, and
+    the deepest matching rule wins. `gitignore_root` makes the .gitignore
+    files of the directories from there down to `root_path` apply as well,
+    along with the repository's .git/info/exclude and core.excludesFile when
+    `gitignore_root` is a git repository.
+    """
+
+    def __init__(
+        self,
+        root_path: Path,
+        ignore_patterns: List[str] = None,
+        num_threads: int = 8,
+        gitignore_root: Optional[Path] = None,
+    ):
         self.root_path = root_path
-        self.ignore_patterns = ignore_patterns or DEFAULT_IGNORE_PATTERNS
+        self.num_threads = num_threads
+        self.gitignore_root = gitignore_root
+        self.ignore_patterns = DEFAULT_IGNORE_PATTERNS if ignore_patterns is None else ignore_patterns
+        # All patterns compiled once into a single regex, so each name is matched
+        # in one call. Patterns are normcased like fnmatch.fnmatch does. With no
+        # patterns, "(?!)" matches nothing.
+        self._ignore_re = re.compile(
+            "|".join(
+                f"(?:{fnmatch.translate(os.path.normcase(pattern))})" for pattern in self.ignore_patterns
+            )
+            or "(?!)"
+        )
 
     def walk(self) -> Generator[Path, None, None]:
-        for extension in SUPPORTED_EXTENSIONS:
-            for file_path in self.root_path.rglob(f"*{extension}"):
-                if self._is_ignored(file_path):
+        # Directories are listed concurrently, so on a cold cache (or a network
+        # filesystem) the waits on many directories overlap instead of adding
+        # up. Only a bounded number of listings is in flight at once, which
+        # keeps open file descriptors and queued results in check.
+        executor = ThreadPoolExecutor(max_workers=self.num_threads)
+        max_in_flight = self.num_threads * 4
+        completed = queue.SimpleQueue()
+        to_scan = deque([(str(self.root_path), self._parent_gitignore_rules())])
+        in_flight = 0
+        try:
+            while to_scan or in_flight:
+                while to_scan and in_flight < max_in_flight:
+                    future = executor.submit(self._scan_dir, *to_scan.pop())
+                    future.add_done_callback(completed.put)
+                    in_flight += 1
+                subdirs, files = completed.get().result()
+                in_flight -= 1
+                to_scan.extend(subdirs)
+                for file_path in files:
+                    if not self._is_ignored(file_path):
+                        yield file_path
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    def _parent_gitignore_rules(self) -> _GitIgnoreRules:
+        """Loads the .gitignore files from `gitignore_root` down to, but excluding, `root_path`."""
+        if self.gitignore_root is None:
+            return ()
+        rules = _git_exclude_rules(str(self.gitignore_root))
+        for dir_path in reversed(self.root_path.parents):
+            if dir_path == self.gitignore_root or self.gitignore_root in dir_path.parents:
+                spec = _load_gitignore(str(dir_path))
+                if spec is not None:
+                    rules += ((str(dir_path), spec),)
+        return rules
+
+    def _scan_dir(
+        self, dir_path: str, rules: _GitIgnoreRules
+    ) -> Tuple[List[Tuple[str, _GitIgnoreRules]], List[Path]]:
+        """
+        Lists one directory, returning the subdirectories to walk next (with
+        the .gitignore rules that apply to them) and the supported files it
+        contains. os.scandir reports each entry's type from the directory
+        listing itself, so no extra stat() calls are needed, and names are
+        filtered as plain strings before any Path is built.
+        """
+        subdirs = []
+        files = []
+        try:
+            with os.scandir(dir_path) as it:
+                entries = list(it)
+        except OSError:
+            return subdirs, files
+
+        # The directory's own .gitignore applies to everything listed in it.
+        if any(entry.name == ".gitignore" for entry in entries):
+            spec = _load_gitignore(dir_path)
+            if spec is not None:
+                rules += ((dir_path, spec),)
+
+        for entry in entries:
+            name = entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    # Every file below an ignored directory would be ignored
+                    # too, so don't descend into it at all.
+                    if not self._is_ignored_name(name) and not _is_gitignored(entry.path, True, rules):
+                        subdirs.append((entry.path, rules))
                     continue
-                yield file_path
+                dot = name.rfind(".")
+                if (
+                    dot != -1
+                    and name[dot:] in SUPPORTED_EXTENSIONS
+                    and entry.is_file()
+                    and not _is_gitignored(entry.path, False, rules)
+                ):
+                    files.append(Path(entry.path))
+            except OSError:
+                continue
+        return subdirs, files
+
+    def _is_ignored_name(self, name: str) -> bool:
+        return self._ignore_re.match(os.path.normcase(name)) is not None
 
     def _is_ignored(self, path: Path) -> bool:
-        relative_path = path.relative_to(self.root_path)
-        for pattern in self.ignore_patterns:
-            if fnmatch.fnmatch(relative_path, pattern) or fnmatch.fnmatch(path.name, pattern):
-                return True
-            for part in relative_path.parts:
-                if fnmatch.fnmatch(part, pattern):
-                    return True
-        return False
+        # The walk never enters ignored directories, so only the file's own name
+        # and its full relative path are left to check.
+        relative_path = str(path.relative_to(self.root_path))
+        return self._is_ignored_name(path.name) or self._is_ignored_name(relative_path)
 
 
 def get_file_walker(root_path: Path) -> GitFileWalker | FileSystemWalker:
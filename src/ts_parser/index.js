@@ -1,8 +1,9 @@
 import tsMorph from 'ts-morph';
 const { Project, SyntaxKind, Symbol, Node: TsNode, ts } = tsMorph;
 import path from 'path';
+import readline from 'readline';
 
-// --- Enums to match Python Pydantic models ---
+// --- Enums to match the Python models ---
 const NodeType = {
     FILE: "file",
     CLASS: "class",
@@ -112,222 +113,292 @@ function getInternalDeclaration(symbol, rootPath) {
 
 // --- Main Parsing Logic ---
 
-async function main() {
-    try {
-        const args = process.argv.slice(2);
-        let filePath = args[args.indexOf('--filePath') + 1];
-        let rootPath = args[args.indexOf('--rootPath') + 1];
-        let tsconfigPath = args[args.indexOf('--tsconfigPath') + 1];
-
-        // --- Path Normalization for Windows ---
-        if (path.sep === '\\') {
-            if (filePath) filePath = filePath.replace(/\\/g, '/');
-            if (rootPath) rootPath = rootPath.replace(/\\/g, '/');
-            if (tsconfigPath) tsconfigPath = tsconfigPath.replace(/\\/g, '/');
-        }
+/**
+ * Converts Windows path separators to the forward slashes ts-morph expects.
+ * @param {string|undefined} p - The path to normalize.
+ * @returns {string|undefined} The normalized path.
+ */
+function normalizePath(p) {
+    return p && path.sep === '\\' ? p.replace(/\\/g, '/') : p;
+}
 
-        if (!filePath || !rootPath || !tsconfigPath) {
-            console.error('Usage: node index.js --filePath <path> --rootPath <path> --tsconfigPath <path>');
-            process.exit(1);
+/**
+ * Parses a single file and returns its nodes, edges and dynamic scope IDs.
+ * @param {import('ts-morph').Project} project - The project containing the file.
+ * @param {string} filePath - The absolute path of the file to parse.
+ * @param {string} rootPath - The absolute path to the project root.
+ * @returns {{nodes: object[], edges: object[], dynamicScopeIds: string[]}}
+ */
+function parseFile(project, filePath, rootPath) {
+    const sourceFile = project.getSourceFileOrThrow(filePath);
+
+    const nodes = [];
+    const edges = [];
+    const discoveredIds = new Set();
+    const dynamicScopeIds = new Set();
+
+    const addNode = (nodeData) => {
+        if (nodeData.id && !discoveredIds.has(nodeData.id)) {
+            nodes.push(nodeData);
+            discoveredIds.add(nodeData.id);
         }
+    };
 
-        const project = new Project({ tsConfigFilePath: tsconfigPath });
-        const sourceFile = project.getSourceFileOrThrow(filePath);
-
-        const nodes = [];
-        const edges = [];
-        const discoveredIds = new Set();
-        const dynamicScopeIds = new Set();
-
-        const addNode = (nodeData) => {
-            if (nodeData.id && !discoveredIds.has(nodeData.id)) {
-                nodes.push(nodeData);
-                discoveredIds.add(nodeData.id);
+    const addEdge = (edgeData) => {
+        if (edgeData.source && edgeData.target) {
+            edges.push(edgeData);
+        }
+    };
+
+    // --- Pass 1: Node Discovery & Containment ---
+    const absoluteFileId = sourceFile.getFilePath();
+    const fileId = path.relative(rootPath, absoluteFileId).replace(/\\/g, '/');
+    addNode({
+        id: fileId,
+        type: NodeType.FILE,
+        name: path.basename(fileId),
+        metadata: { file_path: fileId, start_line: 1, end_line: sourceFile.getEndLineNumber() }
+    });
+
+    sourceFile.forEachDescendant((node) => {
+        const parentId = generateNodeId(node.getParent());
+        let nodeType = null;
+        let nodeName = '';
+
+        if (TsNode.isClassDeclaration(node)) nodeType = NodeType.CLASS;
+        else if (TsNode.isFunctionDeclaration(node)) nodeType = NodeType.FUNCTION;
+        else if (TsNode.isInterfaceDeclaration(node)) nodeType = NodeType.INTERFACE;
+        else if (TsNode.isEnumDeclaration(node)) nodeType = NodeType.ENUM;
+        else if (TsNode.isTypeAliasDeclaration(node)) nodeType = NodeType.TYPE;
+        else if (TsNode.isModuleDeclaration(node)) nodeType = NodeType.NAMESPACE;
+        else if (TsNode.isVariableDeclaration(node)) {
+            const initializer = node.getInitializer();
+            if (initializer && (TsNode.isArrowFunction(initializer) || TsNode.isFunctionExpression(initializer))) {
+                nodeType = NodeType.FUNCTION;
+            } else if (node.getFirstAncestorByKind(SyntaxKind.FunctionDeclaration) === undefined) {
+                nodeType = NodeType.VARIABLE;
+            }
+        }
+        else if (TsNode.isMethodDeclaration(node)) nodeType = NodeType.FUNCTION;
+        else if (TsNode.isPropertyDeclaration(node)) nodeType = NodeType.VARIABLE;
+        else if (TsNode.isConstructorDeclaration(node)) nodeType = NodeType.FUNCTION;
+
+        if (nodeType) {
+            // Centralized name-finding logic, keeping the display name simple.
+            if (TsNode.isConstructorDeclaration(node)) {
+                nodeName = 'constructor';
+            } else if (TsNode.isNamed(node)) {
+                nodeName = node.getName();
+            }
+            
+            if (!nodeName && TsNode.isVariableDeclaration(node)) {
+                nodeName = node.getName();
+            }
+            
+            if (!nodeName && TsNode.isExportable(node) && node.isDefaultExport()) {
+                nodeName = '::default';
             }
-        };
 
-        const addEdge = (edgeData) => {
-            if (edgeData.source && edgeData.target) {
-                edges.push(edgeData);
+            const nodeId = generateNodeId(node, rootPath);
+            addNode({
+                id: nodeId,
+                type: nodeType,
+                name: nodeName,
+                metadata: { file_path: fileId, start_line: node.getStartLineNumber(), end_line: node.getEndLineNumber() }
+            });
+        }
+    });
+
+    // --- Pass 2: Dependency Discovery ---
+    function discoverAndLink(node, scopeStack) {
+        const currentScopeId = scopeStack[scopeStack.length - 1];
+        let nodeId = null;
+
+        // Find the corresponding node from Pass 1 to establish its ID.
+        const nodeNamePart = generateNodeId(node, rootPath)?.split(':').pop();
+        const foundNode = nodes.find(n => 
+            n.metadata.start_line === node.getStartLineNumber() && 
+            n.id.endsWith(nodeNamePart || '___impossible___')
+        );
+        
+        if (foundNode) {
+            nodeId = foundNode.id;
+            // Create the CONTAINS edge using the correct parent from the scope stack.
+            if (currentScopeId !== nodeId) {
+                addEdge({ source: currentScopeId, target: nodeId, type: EdgeType.CONTAINS });
             }
-        };
-
-        // --- Pass 1: Node Discovery & Containment ---
-        const absoluteFileId = sourceFile.getFilePath();
-        const fileId = path.relative(rootPath, absoluteFileId).replace(/\\/g, '/');
-        addNode({
-            id: fileId,
-            type: NodeType.FILE,
-            name: path.basename(fileId),
-            metadata: { file_path: fileId, start_line: 1, end_line: sourceFile.getEndLineNumber() }
-        });
-
-        sourceFile.forEachDescendant((node) => {
-            const parentId = generateNodeId(node.getParent());
-            let nodeType = null;
-            let nodeName = '';
-
-            if (TsNode.isClassDeclaration(node)) nodeType = NodeType.CLASS;
-            else if (TsNode.isFunctionDeclaration(node)) nodeType = NodeType.FUNCTION;
-            else if (TsNode.isInterfaceDeclaration(node)) nodeType = NodeType.INTERFACE;
-            else if (TsNode.isEnumDeclaration(node)) nodeType = NodeType.ENUM;
-            else if (TsNode.isTypeAliasDeclaration(node)) nodeType = NodeType.TYPE;
-            else if (TsNode.isModuleDeclaration(node)) nodeType = NodeType.NAMESPACE;
-            else if (TsNode.isVariableDeclaration(node)) {
-                const initializer = node.getInitializer();
-                if (initializer && (TsNode.isArrowFunction(initializer) || TsNode.isFunctionExpression(initializer))) {
-                    nodeType = NodeType.FUNCTION;
-                } else if (node.getFirstAncestorByKind(SyntaxKind.FunctionDeclaration) === undefined) {
-                    nodeType = NodeType.VARIABLE;
-                }
+        }
+
+        // --- Find Dependencies FROM the current scope ---
+        // IMPORTS
+        if (TsNode.isImportDeclaration(node)) {
+            const targetFile = node.getModuleSpecifierSourceFile();
+            if (targetFile && getInternalDeclaration(targetFile.getSymbol(), rootPath)) {
+                const targetFileId = path.relative(rootPath, targetFile.getFilePath()).replace(/\\/g, '/');
+                addEdge({ source: fileId, target: targetFileId, type: EdgeType.IMPORTS });
             }
-            else if (TsNode.isMethodDeclaration(node)) nodeType = NodeType.FUNCTION;
-            else if (TsNode.isPropertyDeclaration(node)) nodeType = NodeType.VARIABLE;
-            else if (TsNode.isConstructorDeclaration(node)) nodeType = NodeType.FUNCTION;
-
-            if (nodeType) {
-                // Centralized name-finding logic, keeping the display name simple.
-                if (TsNode.isConstructorDeclaration(node)) {
-                    nodeName = 'constructor';
-                } else if (TsNode.isNamed(node)) {
-                    nodeName = node.getName();
-                }
-                
-                if (!nodeName && TsNode.isVariableDeclaration(node)) {
-                    nodeName = node.getName();
-                }
-                
-                if (!nodeName && TsNode.isExportable(node) && node.isDefaultExport()) {
-                    nodeName = '::default';
-                }
+        }
 
-                const nodeId = generateNodeId(node, rootPath);
-                addNode({
-                    id: nodeId,
-                    type: nodeType,
-                    name: nodeName,
-                    metadata: { file_path: fileId, start_line: node.getStartLineNumber(), end_line: node.getEndLineNumber() }
-                });
+        // INHERITS / IMPLEMENTS
+        if (TsNode.isClassDeclaration(node)) {
+            const classId = generateNodeId(node, rootPath);
+            const baseClass = node.getBaseClass();
+            const baseClassDecl = getInternalDeclaration(baseClass?.getSymbol(), rootPath);
+            if (baseClassDecl) {
+                addEdge({ source: classId, target: generateNodeId(baseClassDecl, rootPath), type: EdgeType.INHERITS });
             }
-        });
-
-        // --- Pass 2: Dependency Discovery ---
-        function discoverAndLink(node, scopeStack) {
-            const currentScopeId = scopeStack[scopeStack.length - 1];
-            let nodeId = null;
-
-            // Find the corresponding node from Pass 1 to establish its ID.
-            const nodeNamePart = generateNodeId(node, rootPath)?.split(':').pop();
-            const foundNode = nodes.find(n => 
-                n.metadata.start_line === node.getStartLineNumber() && 
-                n.id.endsWith(nodeNamePart || '___impossible___')
-            );
-            
-            if (foundNode) {
-                nodeId = foundNode.id;
-                // Create the CONTAINS edge using the correct parent from the scope stack.
-                if (currentScopeId !== nodeId) {
-                    addEdge({ source: currentScopeId, target: nodeId, type: EdgeType.CONTAINS });
+            node.getImplements().forEach(impl => {
+                const implDecl = getInternalDeclaration(impl.getExpression().getSymbol(), rootPath);
+                if (implDecl) {
+                    addEdge({ source: classId, target: generateNodeId(implDecl, rootPath), type: EdgeType.IMPLEMENTS });
                 }
-            }
+            });
+        }
 
-            // --- Find Dependencies FROM the current scope ---
-            // IMPORTS
-            if (TsNode.isImportDeclaration(node)) {
-                const targetFile = node.getModuleSpecifierSourceFile();
-                if (targetFile && getInternalDeclaration(targetFile.getSymbol(), rootPath)) {
-                    const targetFileId = path.relative(rootPath, targetFile.getFilePath()).replace(/\\/g, '/');
+        // CALLS, require() IMPORTS, and dynamic import()
+        if (TsNode.isCallExpression(node)) {
+            const expression = node.getExpression();
+            if (expression.isKind(SyntaxKind.ImportKeyword)) {
+                dynamicScopeIds.add(currentScopeId);
+            } else if (TsNode.isIdentifier(expression) && expression.getText() === 'require' && node.getArguments().length === 1) {
+                const decl = getInternalDeclaration(node.getResolvedSignature()?.getDeclaration()?.getSymbol(), rootPath);
+                if (decl && TsNode.isSourceFile(decl)) {
+                    const targetFileId = path.relative(rootPath, decl.getFilePath()).replace(/\\/g, '/');
                     addEdge({ source: fileId, target: targetFileId, type: EdgeType.IMPORTS });
                 }
-            }
-
-            // INHERITS / IMPLEMENTS
-            if (TsNode.isClassDeclaration(node)) {
-                const classId = generateNodeId(node, rootPath);
-                const baseClass = node.getBaseClass();
-                const baseClassDecl = getInternalDeclaration(baseClass?.getSymbol(), rootPath);
-                if (baseClassDecl) {
-                    addEdge({ source: classId, target: generateNodeId(baseClassDecl, rootPath), type: EdgeType.INHERITS });
+            } else {
+                const decl = getInternalDeclaration(expression.getSymbol(), rootPath);
+                if (decl) {
+                    addEdge({ source: currentScopeId, target: generateNodeId(decl, rootPath), type: EdgeType.CALLS });
                 }
-                node.getImplements().forEach(impl => {
-                    const implDecl = getInternalDeclaration(impl.getExpression().getSymbol(), rootPath);
-                    if (implDecl) {
-                        addEdge({ source: classId, target: generateNodeId(implDecl, rootPath), type: EdgeType.IMPLEMENTS });
-                    }
-                });
             }
+        }
 
-            // CALLS, require() IMPORTS, and dynamic import()
-            if (TsNode.isCallExpression(node)) {
-                const expression = node.getExpression();
-                if (expression.isKind(SyntaxKind.ImportKeyword)) {
-                    dynamicScopeIds.add(currentScopeId);
-                } else if (TsNode.isIdentifier(expression) && expression.getText() === 'require' && node.getArguments().length === 1) {
-                    const decl = getInternalDeclaration(node.getResolvedSignature()?.getDeclaration()?.getSymbol(), rootPath);
-                    if (decl && TsNode.isSourceFile(decl)) {
-                        const targetFileId = path.relative(rootPath, decl.getFilePath()).replace(/\\/g, '/');
-                        addEdge({ source: fileId, target: targetFileId, type: EdgeType.IMPORTS });
-                    }
-                } else {
-                    const decl = getInternalDeclaration(expression.getSymbol(), rootPath);
-                    if (decl) {
-                        addEdge({ source: currentScopeId, target: generateNodeId(decl, rootPath), type: EdgeType.CALLS });
-                    }
+        // USES_TYPE
+        if (TsNode.isTyped(node) && node.getTypeNode()) {
+            node.getTypeNode().forEachDescendant((typeNode) => {
+                if (TsNode.isIdentifier(typeNode) || TsNode.isPropertyAccessExpression(typeNode)) {
+                     const decl = getInternalDeclaration(typeNode.getSymbol(), rootPath);
+                     if(decl) {
+                         addEdge({ source: currentScopeId, target: generateNodeId(decl, rootPath), type: EdgeType.USES_TYPE });
+                     }
                 }
-            }
-
-            // USES_TYPE
-            if (TsNode.isTyped(node) && node.getTypeNode()) {
-                node.getTypeNode().forEachDescendant((typeNode) => {
-                    if (TsNode.isIdentifier(typeNode) || TsNode.isPropertyAccessExpression(typeNode)) {
-                         const decl = getInternalDeclaration(typeNode.getSymbol(), rootPath);
-                         if(decl) {
-                             addEdge({ source: currentScopeId, target: generateNodeId(decl, rootPath), type: EdgeType.USES_TYPE });
-                         }
-                    }
-                });
-            }
+            });
+        }
+        
+        // USES_VARIABLE
+        if (TsNode.isPropertyAccessExpression(node) || TsNode.isIdentifier(node)) {
+            const parent = node.getParent();
+            const isHandledElsewhere = 
+                ts.isDeclaration(parent.compilerNode) ||
+                (TsNode.isPropertyAccessExpression(node) ? false : parent.isKind(SyntaxKind.PropertyAccessExpression)) ||
+                (parent.isKind(SyntaxKind.CallExpression) && parent.getExpression() === node) ||
+                !!node.getAncestors().find(a => TsNode.isTypeNode(a));
             
-            // USES_VARIABLE
-            if (TsNode.isPropertyAccessExpression(node) || TsNode.isIdentifier(node)) {
-                const parent = node.getParent();
-                const isHandledElsewhere = 
-                    ts.isDeclaration(parent.compilerNode) ||
-                    (TsNode.isPropertyAccessExpression(node) ? false : parent.isKind(SyntaxKind.PropertyAccessExpression)) ||
-                    (parent.isKind(SyntaxKind.CallExpression) && parent.getExpression() === node) ||
-                    !!node.getAncestors().find(a => TsNode.isTypeNode(a));
-                
-                if (!isHandledElsewhere) {
-                    const decl = getInternalDeclaration(node.getSymbol(), rootPath);
-                    if (decl && (TsNode.isVariableDeclaration(decl) || TsNode.isPropertyDeclaration(decl) || TsNode.isEnumMember(decl))) {
-                        addEdge({ source: currentScopeId, target: generateNodeId(decl, rootPath), type: EdgeType.USES_VARIABLE });
-                    }
+            if (!isHandledElsewhere) {
+                const decl = getInternalDeclaration(node.getSymbol(), rootPath);
+                if (decl && (TsNode.isVariableDeclaration(decl) || TsNode.isPropertyDeclaration(decl) || TsNode.isEnumMember(decl))) {
+                    addEdge({ source: currentScopeId, target: generateNodeId(decl, rootPath), type: EdgeType.USES_VARIABLE });
                 }
             }
+        }
 
-            // --- Recurse on children with the correct new scope ---
-            let nextScopeStack = scopeStack;
-            let isNewScope = false;
-            
-            // Check if the current node defines a new scope we want to track.
-            if (TsNode.isFunctionDeclaration(node) || TsNode.isMethodDeclaration(node) || TsNode.isClassDeclaration(node) || TsNode.isConstructorDeclaration(node) || TsNode.isModuleDeclaration(node)) {
-                isNewScope = true;
-            } else if (TsNode.isVariableDeclaration(node) && node.getInitializer()?.isKind(SyntaxKind.ArrowFunction)) {
-                isNewScope = true;
+        // --- Recurse on children with the correct new scope ---
+        let nextScopeStack = scopeStack;
+        let isNewScope = false;
+        
+        // Check if the current node defines a new scope we want to track.
+        if (TsNode.isFunctionDeclaration(node) || TsNode.isMethodDeclaration(node) || TsNode.isClassDeclaration(node) || TsNode.isConstructorDeclaration(node) || TsNode.isModuleDeclaration(node)) {
+            isNewScope = true;
+        } else if (TsNode.isVariableDeclaration(node) && node.getInitializer()?.isKind(SyntaxKind.ArrowFunction)) {
+            isNewScope = true;
+        }
+
+        if (isNewScope) {
+            const newScopeId = generateNodeId(node, rootPath);
+            if (newScopeId) {
+                nextScopeStack = [...scopeStack, newScopeId];
             }
+        }
+        node.forEachChild(child => discoverAndLink(child, nextScopeStack));
+    }
+
+    discoverAndLink(sourceFile, [fileId]);
+
+    return { nodes, edges, dynamicScopeIds: Array.from(dynamicScopeIds) };
+}
 
-            if (isNewScope) {
-                const newScopeId = generateNodeId(node, rootPath);
-                if (newScopeId) {
-                    nextScopeStack = [...scopeStack, newScopeId];
+// --- Entry Points ---
+
+// Projects (each with its own type checker) kept alive by one server.
+const MAX_CACHED_PROJECTS = 2;
+
+/**
+ * Serves parse requests over stdin/stdout until stdin is closed.
+ * Each request is one JSON line ({filePath, rootPath, tsconfigPath}) and is
+ * answered with a 4-byte little-endian length followed by that many bytes of
+ * UTF-8 JSON: either a parse result or {error}.
+ * Projects are kept per tsconfig, so the compiler host and its loaded files
+ * are reused across requests instead of being rebuilt for every file. Each
+ * project holds a full type checker, so only the most recently used few are
+ * kept; every worker process runs its own server.
+ */
+function serve() {
+    const projects = new Map();
+    const rl = readline.createInterface({ input: process.stdin, crlfDelay: Infinity });
+
+    rl.on('line', (line) => {
+        if (!line.trim()) return;
+        let response;
+        try {
+            const request = JSON.parse(line);
+            const filePath = normalizePath(request.filePath);
+            const rootPath = normalizePath(request.rootPath);
+            const tsconfigPath = normalizePath(request.tsconfigPath);
+
+            let project = projects.get(tsconfigPath);
+            if (project) {
+                // Re-insert to mark it as the most recently used.
+                projects.delete(tsconfigPath);
+            } else {
+                project = new Project({ tsConfigFilePath: tsconfigPath });
+                if (projects.size >= MAX_CACHED_PROJECTS) {
+                    // Maps iterate in insertion order: the first key is the least recently used.
+                    projects.delete(projects.keys().next().value);
                 }
             }
-            node.forEachChild(child => discoverAndLink(child, nextScopeStack));
+            projects.set(tsconfigPath, project);
+            response = parseFile(project, filePath, rootPath);
+        } catch (error) {
+            response = { error: error.stack || String(error) };
         }
+        const payload = Buffer.from(JSON.stringify(response), 'utf8');
+        const header = Buffer.alloc(4);
+        header.writeUInt32LE(payload.length, 0);
+        process.stdout.write(Buffer.concat([header, payload]));
+    });
+}
 
-        discoverAndLink(sourceFile, [fileId]);
-        
-        console.log(JSON.stringify({ nodes, edges, dynamicScopeIds: Array.from(dynamicScopeIds) }, null, 2));
+function main() {
+    try {
+        const args = process.argv.slice(2);
+        if (args.includes('--server')) {
+            serve();
+            return;
+        }
+
+        const filePath = normalizePath(args[args.indexOf('--filePath') + 1]);
+        const rootPath = normalizePath(args[args.indexOf('--rootPath') + 1]);
+        const tsconfigPath = normalizePath(args[args.indexOf('--tsconfigPath') + 1]);
+
+        if (!filePath || !rootPath || !tsconfigPath) {
+            console.error('Usage: node index.js --filePath <path> --rootPath <path> --tsconfigPath <path>');
+            console.error('       node index.js --server');
+            process.exit(1);
+        }
+
+        const project = new Project({ tsConfigFilePath: tsconfigPath });
+        console.log(JSON.stringify(parseFile(project, filePath, rootPath), null, 2));
 
     } catch (error) {
         console.error(error.stack);